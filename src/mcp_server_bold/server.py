@@ -1,9 +1,12 @@
 import logging
-import json
 import asyncio
+import base64
+import csv
+from collections import OrderedDict
 from enum import Enum
-import xmltodict
-import requests
+import msgpack
+import orjson
+from lxml import etree
 import httpx
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -15,9 +18,87 @@ from pydantic import BaseModel, Field
 
 API_BASE_URL = "http://v3.boldsystems.org/index.php/API_Public/"
 DEFAULT_PARAMETERS = {"format": "tsv"}
+_ALLOWED_SEARCHES = frozenset({"specimen", "combined"})
+MAX_ROWS = 2000  # Cap rows returned to the client for large BOLD results
+CHUNK_SIZE = 65536  # 64 KiB body reads: fewer syscalls per KB downloaded
 
 logger = logging.getLogger(__name__)
 
+# Shared connection pool; created in serve() so sockets keep alive across tool calls
+_CLIENT: httpx.AsyncClient | None = None
+
+# Cap in-flight BOLD requests; the v3 API is slow and rate-limits bursts
+_SEM = asyncio.Semaphore(8)
+
+# LRU of serialized payloads; BOLD data is static enough that repeat
+# queries within a session can skip the network and the parse entirely
+_CACHE_MAX = 128
+_CACHE: OrderedDict[tuple, bytes] = OrderedDict()
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to JSON bytes using orjson's C encoder."""
+    return orjson.dumps(obj)
+
+
+def _record_to_dict(elem):
+    """Convert an lxml element tree to nested dicts, listing repeated tags."""
+    children = list(elem)
+    if not children:
+        return elem.text
+    record = {}
+    for child in children:
+        value = _record_to_dict(child)
+        if child.tag in record:  # Repeated tag becomes a list
+            if not isinstance(record[child.tag], list):
+                record[child.tag] = [record[child.tag]]
+            record[child.tag].append(value)
+        else:
+            record[child.tag] = value
+    return record
+
+
+async def _parse_tsv(response) -> list[dict]:
+    """Stream a tsv response line by line into list[dict], capped at MAX_ROWS."""
+    lines = []
+    append = lines.append  # Bind hot-loop lookups once
+    async for line in response.aiter_lines():
+        append(line)
+        if len(lines) > MAX_ROWS:  # Header line plus MAX_ROWS rows
+            break  # Stop downloading once the row cap is reached
+    if not lines:
+        return []
+    # First line holds the column names; an immutable tuple is shared by
+    # every row dict. The _csv C tokenizer splits all rows in one pass,
+    # replacing a per-line Python str.split.
+    headers = tuple(lines[0].split('\t'))
+    reader = csv.reader(lines[1:], delimiter='\t', quoting=csv.QUOTE_NONE)
+    return [dict(zip(headers, row)) for row in reader]
+
+
+async def _parse_xml(response) -> list[dict]:
+    """Stream an xml response through lxml's pull parser into a list of records."""
+    # Feed chunks straight into the parser so records are converted as
+    # they complete, without buffering the whole body
+    parser = etree.XMLPullParser(events=('end',), tag='record')
+    json_data = []
+    async for chunk in response.aiter_bytes(chunk_size=CHUNK_SIZE):  # Stream response
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            json_data.append(_record_to_dict(elem))
+            elem.clear()  # Keep peak memory bounded by one record
+    return json_data
+
+
+# Dispatch requested format to its response handler; msgpack is parsed as
+# tsv and only diverges at serialization time
+_FORMAT_HANDLERS = {
+    'tsv': _parse_tsv,
+    'xml': _parse_xml,
+    'msgpack': _parse_tsv,
+}
+
+
 class BoldQuery(BaseModel):
     """Base Model to define parameters for querying the BOLD API."""
     taxon: str = Field(
@@ -51,8 +132,10 @@ class BoldQuery(BaseModel):
 
 
 class BoldSpecQuery(BoldQuery):
-    """Model for formatting BOLD specimen queries with a specific output format."""
-    format: str = Field(default="tsv", examples=["xml", "tsv"])
+    """Model for formatting BOLD specimen queries with a specific output format.
+    'msgpack' returns base64-wrapped MessagePack, a compact encoding for large results.
+    """
+    format: str = Field(default="tsv", examples=["xml", "tsv", "msgpack"])
 
 
 class BoldSeqQuery(BoldQuery):
@@ -63,78 +146,90 @@ class BoldSeqQuery(BoldQuery):
     )
 
 
+# Schemas never change after import; compute once instead of per tools/list call
+_SPEC_SCHEMA = BoldSpecQuery.schema()
+_SEQ_SCHEMA = BoldSeqQuery.schema()
+
+
 class BoldTools(str, Enum):
     """Enumeration of tools available for querying BOLD API."""
     SPECIMEN = "specimen-search"
     SEQUENCE_SPECIMEN = "combined-search"
 
 
-async def base_fetch(**kwargs):
+async def base_fetch(**kwargs) -> bytes:
     """
     Fetch specimens from BOLD API based on provided parameters.
 
     :param kwargs: Parameters for BOLD specimen query
-    :return: JSON dump of retrieved specimen data
+    :return: Serialized specimen data as UTF-8 JSON bytes (or base64 msgpack)
     """
     # Prepare query parameters
     query_params = {**DEFAULT_PARAMETERS, **kwargs}
     search = query_params.pop("search")
+    if search not in _ALLOWED_SEARCHES:  # Not an assert: those vanish under -O
+        logger.error(f"Unknown search endpoint: {search}")
+        raise ValueError(f"Unknown search endpoint: {search}")
     logger.info(f"Fetching specimens with parameters: {query_params}")
 
-    # Build formatted query string to add to API CALL
-    query_string = '&'.join([
-        f"{key}={requests.utils.quote(str(value))}"
-        for key, value in query_params.items()
-        if value != ""
-    ])
-    query_url = f"{API_BASE_URL}{search}?{query_string}"
-    async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-        try:
-            response = await client.get(query_url)  # Query API
+    # Serve repeat queries from the LRU without refetching or reparsing
+    cache_key = (search, frozenset(query_params.items()))
+    cached = _CACHE.get(cache_key)
+    if cached is not None:
+        _CACHE.move_to_end(cache_key)
+        logger.info("Cache hit; returning stored payload.")
+        return cached
+
+    fmt = query_params.get('format')
+    handler = _FORMAT_HANDLERS.get(fmt)  # Resolve before touching the network
+    if handler is None:
+        logger.error("Unsupported format requested.")
+        raise ValueError("Unsupported format requested.")
+
+    # msgpack is an output encoding only; BOLD itself is queried as tsv
+    upstream_params = {**query_params, 'format': 'tsv'} if fmt == 'msgpack' else query_params
+    # httpx handles query-string encoding; skip params left empty
+    params = {key: value for key, value in upstream_params.items() if value != ""}
+    try:
+        async with _SEM, _CLIENT.stream("GET", search, params=params) as response:  # Query API
+            if response.is_error:
+                # Read while the stream is still open so the handler below
+                # can log the body; after the context exits it is closed
+                await response.aread()
             response.raise_for_status()  # Ensure we handle bad responses
 
             logger.info("Successfully fetched specimens.")
-
-            # Check the format to determine how to handle the response
-            if query_params.get('format') == 'tsv':
-                # Convert tsv response to list[dict] before json
-                json_data = []
-                headers = None
-                async for chunk in response.aiter_bytes():  # Stream response
-                    # Decode and process in chunks
-                    lines = chunk.decode('utf-8').splitlines()
-                    if headers is None:
-                        headers = lines[0].split('\t')  # Read headers from the first chunk
-                    json_data.extend(dict(zip(headers, line.split('\t'))) for line in lines[1:])
-            elif query_params.get('format') == 'xml':
-                # Convert xml response to OrderedDict[str, Any] before json
-                xml_data = bytearray()  # Use bytearray to accumulate chunks
-                async for chunk in response.aiter_bytes():  # Stream response
-                    xml_data.extend(chunk)
-                    json_data = xmltodict.parse(xml_data.decode('utf-8'))
-            else:
-                logger.error("Unsupported format requested.")
-                raise ValueError("Unsupported format requested.")
-            return json.dumps(json_data)  # Return JSON response
-        except (asyncio.TimeoutError, httpx.TimeoutException, asyncio.CancelledError) as exc:
-            logger.error(
-                f"{str(exc)}, likely need to narrow search to fewer specimen"
-            )
-            return json.dumps({
-                "message":
-                "Request timed out, likely need to narrow search to fewer specimen"
-            })
-        except httpx.HTTPStatusError as exc:
-            logger.error(
-                f"HTTP error occurred: {exc.response.status_code} - {exc.response.text}"
+            json_data = await handler(response)
+        if fmt == 'msgpack':
+            # Base64 wrap keeps the payload valid UTF-8 over the MCP stream
+            payload = base64.b64encode(
+                msgpack.packb(json_data, use_bin_type=True)
             )
-            return json.dumps({
-                "message":
-                f"HTTP error occurred: {exc.response.status_code}"
-            })
-        except httpx.RequestError as e:
-            logger.error(f"Error fetching specimens: {str(e)}")
-            return json.dumps({"message": f"HTTP RequestError occurred: {str(e)}"})
+        else:
+            payload = _dumps(json_data)
+        _CACHE[cache_key] = payload  # Only successful fetches are cached
+        if len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)  # Evict least recently used
+        return payload  # Return JSON response
+    except (asyncio.TimeoutError, httpx.TimeoutException, asyncio.CancelledError) as exc:
+        logger.error(
+            f"{str(exc)}, likely need to narrow search to fewer specimen"
+        )
+        return _dumps({
+            "message":
+            "Request timed out, likely need to narrow search to fewer specimen"
+        })
+    except httpx.HTTPStatusError as exc:
+        logger.error(
+            f"HTTP error occurred: {exc.response.status_code} - {exc.response.text}"
+        )
+        return _dumps({
+            "message":
+            f"HTTP error occurred: {exc.response.status_code}"
+        })
+    except httpx.RequestError as e:
+        logger.error(f"Error fetching specimens: {str(e)}")
+        return _dumps({"message": f"HTTP RequestError occurred: {str(e)}"})
 
 
 async def serve() -> None:
@@ -144,6 +239,9 @@ async def serve() -> None:
 
     :return: None
     """
+    # Rebinding the module-level client is deliberate: base_fetch shares
+    # the one pool created for the lifetime of this server process
+    global _CLIENT  # pylint: disable=global-statement
     server = Server("mcp-server-bold")
 
     @server.list_tools()
@@ -152,25 +250,22 @@ async def serve() -> None:
             Tool(
                 name=BoldTools.SPECIMEN,
                 description="Query BOLD API for a specimen",
-                inputSchema=BoldSpecQuery.schema(),
+                inputSchema=_SPEC_SCHEMA,
             ),
             Tool(
                 name=BoldTools.SEQUENCE_SPECIMEN,
                 description="Query BOLD API for both specimen info and nucleotide (DNA) sequence",
-                inputSchema=BoldSeqQuery.schema(),
+                inputSchema=_SEQ_SCHEMA,
             ),
             # Add new tools here
         ]
 
     @server.call_tool()
     async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-        # Remove None values and prepare query
+        # Remove None values and prepare query; base_fetch merges in
+        # DEFAULT_PARAMETERS, so the tsv format default lives in one place
         query_params = {k: v for k, v in arguments.items() if v is not None}
 
-        # Ensure format is set, defaulting to tsv
-        if 'format' not in query_params:
-            query_params['format'] = 'tsv'
-
         logger.info(f"Calling tool with parameters: {query_params}")
         match name:
             case BoldTools.SPECIMEN:
@@ -179,7 +274,8 @@ async def serve() -> None:
                 specimen_data = await base_fetch(**query_params)
                 return [TextContent(
                     type="text",
-                    text=f"Returned:\n{specimen_data}"
+                    # Single decode at the protocol boundary
+                    text=(b"Returned:\n" + specimen_data).decode()
                 )]
             case BoldTools.SEQUENCE_SPECIMEN:
                 query_params["search"] = "combined"
@@ -187,7 +283,8 @@ async def serve() -> None:
                 combined_data = await base_fetch(**query_params)
                 return [TextContent(
                     type="text",
-                    text=f"Returned:\n{combined_data}"
+                    # Single decode at the protocol boundary
+                    text=(b"Returned:\n" + combined_data).decode()
                 )]
             # Add other tools here
         # When don't recognize tool
@@ -195,5 +292,22 @@ async def serve() -> None:
         raise ValueError(f"Unknown tool: {name}")
 
     options = server.create_initialization_options()
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, options)
+    async with httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        timeout=httpx.Timeout(10.0),
+        # Pool options live on the transport once one is supplied explicitly;
+        # http2 multiplexes concurrent calls over a single connection when
+        # BOLD serves TLS, and retries=1 absorbs stale keep-alive drops
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=1,
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0,
+            ),
+        ),
+    ) as client:
+        _CLIENT = client
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, options)